@@ -0,0 +1,23 @@
+import pandas as pd
+from tsdownsample import MinMaxLTTBDownsampler
+
+# Réduction des séries temporelles avant Plotly : au-delà de MAX_POINTS points par courbe,
+# MinMaxLTTB garde la forme (pics inclus) et le navigateur ne reçoit que MAX_POINTS points
+
+MAX_POINTS = 1500
+
+def downsample(df, x='date_log', y='total_mb', n_out=MAX_POINTS):
+    # Les lignes doivent être triées sur x (c'est le cas : ORDER BY date_log)
+    if len(df) <= n_out:
+        return df
+    xs = pd.to_datetime(df[x]).to_numpy().astype('int64')
+    idx = MinMaxLTTBDownsampler().downsample(xs, df[y].to_numpy(), n_out=n_out)
+    return df.iloc[idx]
+
+# Une réduction par courbe : chaque location garde jusqu'à n_out points
+def downsample_by(df, group, x='date_log', y='total_mb', n_out=MAX_POINTS):
+    if len(df) <= n_out:
+        return df
+    return pd.concat(
+        [downsample(g, x, y, n_out) for _, g in df.groupby(group, observed=True, sort=False)]
+    )
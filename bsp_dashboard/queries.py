@@ -0,0 +1,221 @@
+import streamlit as st
+from mysql.connector import pooling
+from mysql.connector.errors import PoolError
+import pandas as pd
+import numpy as np
+import os
+import time
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+# Requêtes partagées par les dashboards : un seul module, donc un seul cache
+# st.cache_data / st.cache_resource pour toutes les pages du serveur Streamlit
+
+# Chargement des variables d'environnement (fichier .env)
+load_dotenv()
+
+# Exécutable suivi : comparé à glpi_network_stats.app_basename, le nom sans chemin (migrations/004)
+APP_NAME = "bsp.exe"
+
+# Durée de vie (secondes) des résultats en cache, 5 minutes par défaut (variable CACHE_TTL du .env)
+CACHE_TTL = int(os.getenv("CACHE_TTL", "300"))
+
+# --- Connexion Base de Données (pool partagé entre les reruns) ---
+# Pool commun à toutes les sessions du serveur : chaque chargement global en prend 2 en parallèle,
+# une recherche player 1. 10 par défaut (DB_POOL_SIZE du .env, 32 au plus pour mysql.connector)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+
+# Les erreurs sont affichées par les fonctions get_*
+@st.cache_resource
+def get_pool():
+    return pooling.MySQLConnectionPool(
+        pool_name="bsp",
+        pool_size=DB_POOL_SIZE,
+        host=os.getenv("DB_HOST"),
+        port=os.getenv("DB_PORT"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        database=os.getenv("DB_NAME")
+    )
+
+# Attente maximale (secondes) d'une connexion libre quand tout le pool est occupé
+POOL_TIMEOUT = 10
+
+# pool.get_connection() lève PoolError tout de suite si le pool est épuisé :
+# on réessaie jusqu'à ce qu'une autre session rende sa connexion, dans la limite de POOL_TIMEOUT
+def get_connection(pool):
+    deadline = time.monotonic() + POOL_TIMEOUT
+    while True:
+        try:
+            return pool.get_connection()
+        except PoolError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.05)
+
+# --- Helpers de lecture ---
+# Le pool est passé en argument : aucun appel st.*, utilisables depuis un thread sans ScriptRunContext
+
+# Lecture directe du curseur vers un DataFrame (sans passer par pd.read_sql)
+def run_query(pool, query, params=()):
+    # close() rend la connexion au pool
+    with closing(get_connection(pool)) as conn:
+        with closing(conn.cursor()) as cur:
+            cur.execute(query, params)
+            # coerce_float convertit les DECIMAL (SUM) en float
+            df = pd.DataFrame.from_records(cur.fetchall(), columns=cur.column_names, coerce_float=True)
+    # Les DATE arrivent en objets datetime.date (dtype object) : colonne datetime64 vectorisée
+    if 'date_log' in df.columns:
+        df['date_log'] = pd.to_datetime(df['date_log'])
+    return df
+
+# Lecture d'une seule ligne de scalaires (KPIs) sous forme de dict
+def run_query_row(pool, query, params=()):
+    with closing(get_connection(pool)) as conn:
+        with closing(conn.cursor()) as cur:
+            cur.execute(query, params)
+            return dict(zip(cur.column_names, cur.fetchone()))
+
+# --- Récupération des Données (Mise en cache) ---
+# Les requêtes globales lisent la table de synthèse bsp.exe rafraîchie toutes les heures (migrations/005) :
+# octets par jour et par location_id. Le libellé est joint au moment de la lecture depuis la vue
+# bsp_location_labels : nom de la location, suffixé de son id quand plusieurs locations le partagent
+# Toutes les requêtes regroupent par location_id, jamais par nom
+
+# KPIs calculés côté serveur (une seule ligne), communs aux deux dashboards
+# Même jointure que les requêtes de lecture : les KPIs portent sur les lignes affichées
+QUERY_KPIS = """
+SELECT 
+    ROUND(SUM(d.total_bytes) / 1048576, 2) AS total_mb,
+    ROUND(MAX(d.total_bytes) / 1048576, 2) AS peak_mb,
+    MAX(d.date_log) AS last_date,
+    (
+        SELECT COUNT(DISTINCT b.location_id)
+        FROM bsp_daily_by_location b
+        JOIN bsp_location_labels l ON b.location_id = l.location_id
+    ) AS nb_locations
+FROM (
+    SELECT b.date_log, SUM(b.total_bytes) AS total_bytes
+    FROM bsp_daily_by_location b
+    JOIN bsp_location_labels l ON b.location_id = l.location_id
+    GROUP BY b.date_log
+) d;
+"""
+
+# Les lectures en cache (load_daily_by_location, load_player_data) laissent remonter les erreurs :
+# st.cache_data ne mémorise pas une exception, la requête est relancée au rerun suivant au lieu de
+# servir un résultat vide pendant CACHE_TTL. Les get_* appelées par les pages affichent l'erreur
+# et renvoient du vide.
+
+# Lecture commune aux deux pages : une seule entrée en cache, donc une seule paire de requêtes
+# (timeline + QUERY_KPIS) par CACHE_TTL, quelle que soit la page ouverte
+@st.cache_data(ttl=CACHE_TTL, show_spinner='Loading statistics...')
+def load_daily_by_location():
+    # Une ligne de la table par (date, location_id), sans GROUP BY
+    # MB non arrondis (4 décimales) : totaux et Top 10 sont sommés dessus, arrondis une fois agrégés
+    query = """
+    SELECT 
+        b.date_log, 
+        l.location_name, 
+        b.total_bytes / 1048576 AS total_mb
+    FROM bsp_daily_by_location b
+    JOIN bsp_location_labels l ON b.location_id = l.location_id
+    ORDER BY b.date_log ASC;
+    """
+
+    # Pool (st.cache_resource) obtenu sur le thread du script : les threads ne touchent qu'à mysql.connector
+    pool = get_pool()
+    # Les deux requêtes partent en parallèle, chacune sur sa connexion du pool
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        f_df = ex.submit(run_query, pool, query)
+        f_kpis = ex.submit(run_query_row, pool, QUERY_KPIS)
+        df, kpis = f_df.result(), f_kpis.result()
+
+    # Catégorie : chaque location n'est stockée qu'une fois, Plotly et les groupby travaillent sur des codes entiers
+    df['location_name'] = df['location_name'].astype('category')
+    return df, kpis
+
+# Les vues de chaque page sont dérivées de load_daily_by_location sans cache propre : quelques groupby
+# sur O(dates x locations) lignes, jamais plus périmés que la lecture dont ils dépendent
+
+# Page principale : timeline par location, Top 10 et KPIs
+def load_global_data():
+    df_time, kpis = load_daily_by_location()
+
+    # Table vide (déploiement neuf, aucune ligne bsp.exe) : total_mb serait de dtype object
+    if df_time.empty:
+        return df_time, (np.array([], dtype=str), np.array([])), kpis
+
+    # Top 10 des Locations dérivé de la timeline (même grain, pas de seconde requête)
+    # Libellés uniques par location_id (bsp_location_labels) : grouper sur le libellé revient à grouper par id
+    # Tableaux NumPy (libellés en dtype str : contenu hachable par st.cache_data)
+    top = df_time.groupby('location_name', observed=True, sort=False)['total_mb'].sum().nlargest(10)
+    top_locations = (top.index.to_numpy(dtype=str), top.to_numpy().round(2))
+    # Arrondi après le Top 10 ; float64 conservé, la courbe totale re-somme ces valeurs
+    df_time['total_mb'] = df_time['total_mb'].round(2)
+    return df_time, top_locations, kpis
+
+def get_global_data():
+    try:
+        return load_global_data()
+    except Exception as e:
+        st.error(f"Erreur SQL Global: {e}")
+        return pd.DataFrame(), (np.array([], dtype=str), np.array([])), {}
+
+# Page consommation : totaux par jour et par location, et KPIs
+def load_global_totals():
+    df, kpis = load_daily_by_location()
+
+    # 1. Timeline globale (consommation totale par jour)
+    df_timeline = df.groupby('date_log', as_index=False)['total_mb'].sum().round(2)
+    # 2. Classement par location (bar chart) : dérivé de la même lecture, sans seconde requête
+    # sort=False : inutile de trier par nom, le sort_values trie ensuite par MB
+    df_location = (
+        df.groupby('location_name', as_index=False, observed=True, sort=False)['total_mb'].sum().round(2)
+        .sort_values('total_mb', ascending=False)
+    )
+    return df_timeline, df_location, kpis
+
+def get_global_totals():
+    try:
+        return load_global_totals()
+    except Exception as e:
+        st.error(f"Global data query error: {e}")
+        return pd.DataFrame(), pd.DataFrame(), {}
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner="...") # Un cache par tag
+def load_player_data(player_tag):
+    # Les computers du tag sont résolus d'abord (index glpi_agents(tag, items_id)),
+    # puis lus dans glpi_network_stats par l'index sur computers_id
+    # Mêmes libellés que les requêtes globales, regroupés par location_id
+    query = """
+    SELECT 
+        ns.date_log, 
+        l.location_name, 
+        ROUND(SUM(ns.total_sent + ns.total_received) / 1048576, 2) AS total_mb
+    FROM glpi_network_stats ns
+    JOIN glpi_computers c ON ns.computers_id = c.id
+    JOIN bsp_location_labels l ON c.locations_id = l.location_id
+    WHERE ns.app_basename = %s 
+    AND ns.computers_id IN (
+        SELECT a.items_id
+        FROM glpi_agents a
+        WHERE a.itemtype = 'Computer'
+        AND a.tag LIKE %s
+    )
+    GROUP BY ns.date_log, c.locations_id, l.location_name
+    ORDER BY ns.date_log ASC;
+    """
+    # Recherche par préfixe : permet un range scan sur l'index glpi_agents(tag)
+    df = run_query(get_pool(), query, (APP_NAME, f"{player_tag}%"))
+
+    # Comme pour la timeline globale : location répétée à chaque date
+    return df.astype({'location_name': 'category'})
+
+def get_player_data(player_tag):
+    try:
+        return load_player_data(player_tag)
+    except Exception as e:
+        st.error(f"Erreur SQL Player: {e}")
+        return pd.DataFrame()
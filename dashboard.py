@@ -1,12 +1,12 @@
 import streamlit as st
-import mysql.connector
-import pandas as pd
 import plotly.express as px
-import os
-from dotenv import load_dotenv
-
-# Chargement des variables d'environnement (fichier .env)
-load_dotenv()
+import streamlit.components.v1 as components
+from plotly.offline import get_plotlyjs_version
+from itertools import cycle
+# Page principale de l'app multipage (streamlit run dashboard.py), les autres vues sont dans pages/
+# Connexion, requêtes et leur cache sont partagés entre toutes les pages
+from bsp_dashboard.queries import CACHE_TTL, get_global_data, get_player_data
+from bsp_dashboard.downsampling import downsample, downsample_by
 
 # --- 1. Configuration de la Page & CSS ---
 st.set_page_config(page_title="BSP Monitoring", layout="wide", initial_sidebar_state="collapsed")
@@ -66,203 +66,191 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# --- 2. Connexion Base de Données ---
-def init_connection():
-    try:
-        return mysql.connector.connect(
-            host=os.getenv("DB_HOST"),
-            port=os.getenv("DB_PORT"),
-            user=os.getenv("DB_USER"),
-            password=os.getenv("DB_PASSWORD"),
-            database=os.getenv("DB_NAME")
+# --- 2. Construction des Graphiques (Mise en cache) ---
+# Les figures ne sont reconstruites que si les données changent (cache_data hache le contenu)
+# Même ttl que les requêtes et max_entries borné : les figures des données périmées ne s'accumulent pas en RAM
+# Elles sont mises en cache déjà sérialisées en JSON, rendues directement par Plotly.js
+
+# Même version de Plotly.js que celle embarquée par le paquet plotly installé
+PLOTLY_JS_URL = f"https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"
+
+def render_fig(fig_json, height):
+    components.html(f"""
+        <style>body {{ margin: 0; background: transparent; }}</style>
+        <script src="{PLOTLY_JS_URL}"></script>
+        <div id="chart" style="height: {height}px;"></div>
+        <script>
+            const fig = {fig_json};
+            Plotly.newPlot('chart', fig.data, fig.layout, {{responsive: true, displaylogo: false}});
+        </script>
+    """, height=height)
+
+# Couleur fixe par location : stable d'un rerun à l'autre, calculée une seule fois
+@st.cache_data(ttl=CACHE_TTL, max_entries=20, show_spinner=False)
+def location_color_map(locations):
+    return dict(zip(locations, cycle(px.colors.qualitative.Bold)))
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=20, show_spinner=False)
+def build_timeline_fig(df, split_by_location):
+    if split_by_location:
+        df = downsample_by(df, 'location_name')
+        # Les catégories sont déjà triées et dédoublonnées
+        trace_args = dict(
+            color='location_name', # Une ligne par couleur de location
+            color_discrete_map=location_color_map(tuple(df['location_name'].cat.categories))
         )
-    except Exception as e:
-        st.error(f"Erreur de connexion DB : {e}")
-        return None
+    else:
+        # Une seule courbe : total par jour (les dates arrivent déjà triées)
+        df = downsample(df.groupby('date_log', as_index=False, sort=False)['total_mb'].sum())
+        trace_args = dict(color_discrete_sequence=px.colors.qualitative.Bold)
+    fig = px.line(
+        df, 
+        x='date_log', 
+        y='total_mb', 
+        labels={'total_mb': 'MB', 'date_log': '', 'location_name': 'Loc'},
+        height=380,
+        template="plotly_dark",
+        render_mode='webgl', # WebGL : tous les points en un seul batch GPU au lieu de noeuds SVG
+        **trace_args
+    )
+    fig.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        margin=dict(l=10, r=10, t=10, b=10),
+        legend=dict(orientation="h", y=1.1, x=0),
+        xaxis=dict(showgrid=False),
+        yaxis=dict(showgrid=True, gridcolor='#444')
+    )
+    return fig.to_json()
+
+@st.cache_data(ttl=CACHE_TTL, max_entries=20, show_spinner=False)
+def build_ranking_fig(names, values):
+    fig = px.bar(
+        x=values, 
+        y=names, 
+        orientation='h',
+        color=values, 
+        color_continuous_scale='Viridis',
+        labels={'x': 'MB', 'y': '', 'color': 'MB'},
+        height=380,
+        template="plotly_dark"
+    )
+    fig.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        margin=dict(l=10, r=10, t=10, b=10),
+        yaxis={'categoryorder':'total ascending'},
+        xaxis=dict(showgrid=True, gridcolor='#444'),
+        coloraxis_showscale=False
+    )
+    return fig.to_json()
 
-# --- 3. Récupération des Données (Mise en cache) ---
+# Une entrée par tag recherché : borne plus large
+@st.cache_data(ttl=CACHE_TTL, max_entries=50, show_spinner=False)
+def build_player_fig(df):
+    # px.area n'a pas de rendu WebGL : ligne WebGL remplie jusqu'à zéro
+    fig = px.line(
+        df, x='date_log', y='total_mb',
+        title="Usage Trend",
+        template="plotly_dark",
+        render_mode='webgl'
+    )
+    fig.update_traces(fill='tozeroy')
+    fig.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        margin=dict(l=0,r=0,t=30,b=0), 
+        height=200,
+        showlegend=False
+    )
+    return fig.to_json()
 
-@st.cache_data(ttl=300) # Mise à jour toutes les 5 minutes
-def get_global_data():
-    conn = init_connection()
-    if conn is None: return pd.DataFrame(), pd.DataFrame()
+# --- 3. Sidebar (Menu Latéral) : Recherche ---
+# Fragment : la recherche d'un tag ne relance que ce bloc, pas toute la page
+@st.fragment
+def player_fragment():
+    st.header("🔎 Player Inspection")
+    st.caption("Rechercher un équipement spécifique par son Tag.")
     
-    # Requête 1 : Timeline groupée par Date ET Location
-    query_timeline = """
-    SELECT 
-        ns.date_log, 
-        l.name as location_name, 
-        SUM(ns.total_sent + ns.total_received) as total_bytes
-    FROM glpi_network_stats ns
-    JOIN glpi_computers c ON ns.computers_id = c.id
-    JOIN glpi_locations l ON c.locations_id = l.id
-    WHERE ns.app_name LIKE '%bsp.exe%'
-    GROUP BY ns.date_log, l.name
-    ORDER BY ns.date_log ASC;
-    """
+    # Formulaire : la requête ne part qu'à la validation, pas à chaque frappe
+    with st.form("player_form"):
+        player_input = st.text_input("Player Tag (ex: DAL-DDP...)", "", placeholder="Début du tag (recherche par préfixe)")
+        submitted = st.form_submit_button("Search")
     
-    # Requête 2 : Classement global par Location
-    query_ranking = """
-    SELECT 
-        l.name as location_name, 
-        SUM(ns.total_sent + ns.total_received) as total_bytes
-    FROM glpi_network_stats ns
-    JOIN glpi_computers c ON ns.computers_id = c.id
-    JOIN glpi_locations l ON c.locations_id = l.id
-    WHERE ns.app_name LIKE '%bsp.exe%'
-    GROUP BY l.name
-    ORDER BY total_bytes DESC;
-    """
+    # Le dernier tag validé reste affiché lors des reruns suivants (servi par le cache)
+    if submitted:
+        st.session_state.player_tag = player_input
+    player_tag = st.session_state.get("player_tag", "")
     
-    try:
-        df_time = pd.read_sql(query_timeline, conn)
-        df_rank = pd.read_sql(query_ranking, conn)
-        conn.close()
-        return df_time, df_rank
-    except Exception as e:
-        st.error(f"Erreur SQL Global: {e}")
-        if conn.is_connected(): conn.close()
-        return pd.DataFrame(), pd.DataFrame()
+    if player_tag:
+        df_p = get_player_data(player_tag)
+        
+        if not df_p.empty:
+            st.success(f"Found: {player_tag}")
+            st.metric("Total Consumed", f"{df_p['total_mb'].sum():.2f} MB")
+            
+            # Petit graph dans la sidebar
+            render_fig(build_player_fig(df_p), height=200)
+        else:
+            st.warning("Tag introuvable.")
 
-def get_player_data(player_tag):
-    conn = init_connection()
-    if conn is None: return pd.DataFrame()
-    
-    query = """
-    SELECT 
-        ns.date_log, 
-        l.name as location_name, 
-        a.tag as player_id,
-        SUM(ns.total_sent + ns.total_received) as total_bytes
-    FROM glpi_network_stats ns
-    JOIN glpi_computers c ON ns.computers_id = c.id
-    JOIN glpi_locations l ON c.locations_id = l.id
-    JOIN glpi_agents a ON a.items_id = c.id AND a.itemtype = 'Computer'
-    WHERE ns.app_name LIKE '%bsp.exe%' 
-    AND a.tag LIKE %s
-    GROUP BY ns.date_log, l.name, a.tag 
-    ORDER BY ns.date_log ASC;
-    """
-    try:
-        df = pd.read_sql(query, conn, params=(f"%{player_tag}%",))
-        conn.close()
-        return df
-    except Exception as e:
-        st.error(f"Erreur SQL Player: {e}")
-        if conn.is_connected(): conn.close()
-        return pd.DataFrame()
+# Un fragment ne peut pas appeler st.sidebar lui-même : on l'appelle dans le contexte sidebar
+# Rendue avant le chargement global pour être utilisable sans attendre les requêtes
+with st.sidebar:
+    player_fragment()
 
 # --- 4. Affichage Principal ---
 
 st.title("📊 BSP.exe Network Monitoring")
 
-# Chargement des données
-df_timeline, df_ranking = get_global_data()
-
-if not df_timeline.empty and not df_ranking.empty:
-    # Conversion Bytes -> MB
-    df_timeline['total_mb'] = (df_timeline['total_bytes'] / (1024 * 1024)).round(2)
-    df_ranking['total_mb'] = (df_ranking['total_bytes'] / (1024 * 1024)).round(2)
-    
-    # Calcul des KPIs
-    total_consumed = df_ranking['total_mb'].sum()
-    top_loc_name = df_ranking.iloc[0]['location_name']
-    top_loc_val = df_ranking.iloc[0]['total_mb']
-    nb_locations = df_ranking['location_name'].nunique()
-    last_date = df_timeline['date_log'].max()
-
+# Squelette affiché immédiatement, rempli une fois les données chargées
+page_body = st.empty()
+with page_body.container():
     # --- LIGNE 1 : KPIs ---
-    k1, k2, k3, k4 = st.columns(4)
-    k1.metric("Total Data (Global)", f"{total_consumed:,.0f} MB")
-    k2.metric("Top Location", f"{top_loc_name}", f"{top_loc_val:.0f} MB")
-    k3.metric("Active Locations", f"{nb_locations}")
-    k4.metric("Last Update", str(last_date))
+    k1, k2, k3, k4 = [col.empty() for col in st.columns(4)]
+    k1.metric("Total Data (Global)", "…")
+    k2.metric("Top Location", "…")
+    k3.metric("Active Locations", "…")
+    k4.metric("Last Update", "…")
 
     st.markdown("<div style='margin-bottom: 20px;'></div>", unsafe_allow_html=True)
 
     # --- LIGNE 2 : Graphiques ---
     col_left, col_right = st.columns([2, 1])
 
-    # Graphique Gauche : Timeline par Location
+    # Graphique Gauche : Timeline (totale ou par Location)
     with col_left:
-        st.markdown('<p class="chart-title">📈 Daily Consumption by Location</p>', unsafe_allow_html=True)
-        fig_time = px.line(
-            df_timeline, 
-            x='date_log', 
-            y='total_mb', 
-            color='location_name', # Une ligne par couleur de location
-            labels={'total_mb': 'MB', 'date_log': '', 'location_name': 'Loc'},
-            height=380,
-            template="plotly_dark",
-            color_discrete_sequence=px.colors.qualitative.Bold
-        )
-        fig_time.update_layout(
-            paper_bgcolor="rgba(0,0,0,0)",
-            plot_bgcolor="rgba(0,0,0,0)",
-            margin=dict(l=10, r=10, t=10, b=10),
-            legend=dict(orientation="h", y=1.1, x=0),
-            xaxis=dict(showgrid=False),
-            yaxis=dict(showgrid=True, gridcolor='#444')
-        )
-        st.plotly_chart(fig_time, use_container_width=True)
+        show_by_location = st.checkbox("Split by location", value=False)
+        chart_title = "Daily Consumption by Location" if show_by_location else "Daily Consumption"
+        st.markdown(f'<p class="chart-title">📈 {chart_title}</p>', unsafe_allow_html=True)
+        timeline_slot = st.empty()
 
     # Graphique Droite : Top 10 Classement
     with col_right:
         st.markdown('<p class="chart-title">🏆 Top 10 Locations</p>', unsafe_allow_html=True)
-        fig_rank = px.bar(
-            df_ranking.head(10), 
-            x='total_mb', 
-            y='location_name', 
-            orientation='h',
-            color='total_mb', 
-            color_continuous_scale='Viridis',
-            labels={'total_mb': 'MB', 'location_name': ''},
-            height=380,
-            template="plotly_dark"
-        )
-        fig_rank.update_layout(
-            paper_bgcolor="rgba(0,0,0,0)",
-            plot_bgcolor="rgba(0,0,0,0)",
-            margin=dict(l=10, r=10, t=10, b=10),
-            yaxis={'categoryorder':'total ascending'},
-            xaxis=dict(showgrid=True, gridcolor='#444'),
-            coloraxis_showscale=False
-        )
-        st.plotly_chart(fig_rank, use_container_width=True)
+        ranking_slot = st.empty()
 
-else:
-    st.info("Aucune donnée disponible. Vérifiez que l'application 'bsp.exe' est bien présente dans les logs.")
+# Chargement des données
+df_timeline, (top_loc_names, top_loc_mb), kpis = get_global_data()
 
-# --- 5. Sidebar (Menu Latéral) : Recherche ---
-with st.sidebar:
-    st.header("🔎 Player Inspection")
-    st.caption("Rechercher un équipement spécifique par son Tag.")
-    
-    player_input = st.text_input("Player Tag (ex: DAL-DDP...)", "")
-    
-    if player_input:
-        with st.spinner("..."):
-            df_p = get_player_data(player_input)
-        
-        if not df_p.empty:
-            df_p['total_mb'] = (df_p['total_bytes'] / (1024 * 1024)).round(2)
-            
-            st.success(f"Found: {player_input}")
-            st.metric("Total Consumed", f"{df_p['total_mb'].sum():.2f} MB")
-            
-            # Petit graph dans la sidebar
-            fig_p = px.area(
-                df_p, x='date_log', y='total_mb',
-                title="Usage Trend",
-                template="plotly_dark"
-            )
-            fig_p.update_layout(
-                paper_bgcolor="rgba(0,0,0,0)",
-                plot_bgcolor="rgba(0,0,0,0)",
-                margin=dict(l=0,r=0,t=30,b=0), 
-                height=200,
-                showlegend=False
-            )
-            st.plotly_chart(fig_p, use_container_width=True)
-        else:
-            st.warning("Tag introuvable.")
+if not df_timeline.empty and len(top_loc_names) > 0:
+    # KPIs : scalaires calculés en SQL, la Top Location est la 1re ligne du classement (trié DESC)
+    total_consumed = kpis['total_mb']
+    top_loc_name = top_loc_names[0]
+    top_loc_val = top_loc_mb[0]
+    nb_locations = kpis['nb_locations']
+    last_date = kpis['last_date']
+
+    k1.metric("Total Data (Global)", f"{total_consumed:,.0f} MB")
+    k2.metric("Top Location", f"{top_loc_name}", f"{top_loc_val:.0f} MB")
+    k3.metric("Active Locations", f"{nb_locations}")
+    k4.metric("Last Update", str(last_date))
+
+    with timeline_slot:
+        render_fig(build_timeline_fig(df_timeline, show_by_location), height=380)
+    with ranking_slot:
+        render_fig(build_ranking_fig(top_loc_names, top_loc_mb), height=380)
+
+else:
+    # Pas de données : le squelette est remplacé par le message
+    page_body.info("Aucune donnée disponible. Vérifiez que l'application 'bsp.exe' est bien présente dans les logs.")
@@ -0,0 +1,13 @@
+-- Index for the bsp.exe filter used by every dashboard query.
+--
+-- The dashboards filter on `ns.app_name = 'bsp.exe'` (previously
+-- `LIKE '%bsp.exe%'`, which cannot use an index). The composite key covers
+-- the filter, the GROUP BY on date_log and the join on computers_id.
+--
+-- Verify afterwards that the access path is `ref` (not `ALL`):
+--   EXPLAIN SELECT ns.date_log, SUM(ns.total_sent + ns.total_received)
+--   FROM glpi_network_stats ns
+--   WHERE ns.app_name = 'bsp.exe'
+--   GROUP BY ns.date_log;
+
+CREATE INDEX idx_app_name ON glpi_network_stats (app_name, date_log, computers_id);
@@ -0,0 +1,7 @@
+-- Index for the player lookup in dashboard.py.
+--
+-- get_player_data matches `a.tag LIKE 'PREFIX%'` (a trailing wildcard only),
+-- which MySQL can serve with a range scan on this index. items_id is
+-- included so the join to glpi_computers is resolved from the index.
+
+CREATE INDEX idx_agents_tag ON glpi_agents (tag, items_id);
@@ -0,0 +1,56 @@
+-- Summary table read by the global dashboard queries.
+--
+-- Holds the bsp.exe consumption per (date, location) so a page render reads
+-- one small table instead of joining and grouping glpi_network_stats.
+-- total_mb keeps 4 decimals; the dashboards round after aggregating.
+
+CREATE TABLE bsp_daily_location_mb (
+    date_log DATE NOT NULL,
+    location_name VARCHAR(255) NOT NULL,
+    total_mb DECIMAL(16, 4) NOT NULL,
+    PRIMARY KEY (date_log, location_name)
+);
+
+-- Full rebuild. Agents can upload old dates late, and a computer moved to
+-- another location or deleted changes past rows, so every date is
+-- recomputed: an upsert of recent days would miss those and never delete
+-- stale rows. The history is loaded into a staging table, then swapped in
+-- with RENAME TABLE, which is atomic: readers see the old rollup or the new
+-- one, never an empty or half-loaded table.
+-- Cost: one pass over the bsp.exe rows (idx_app_name, migrations/001) per
+-- run, on the server and off the page's request path.
+DELIMITER //
+
+CREATE PROCEDURE bsp_rebuild_daily_location_mb()
+BEGIN
+    -- Leftovers from an interrupted run
+    DROP TABLE IF EXISTS bsp_daily_location_mb_new, bsp_daily_location_mb_old;
+    CREATE TABLE bsp_daily_location_mb_new LIKE bsp_daily_location_mb;
+
+    INSERT INTO bsp_daily_location_mb_new (date_log, location_name, total_mb)
+    SELECT
+        ns.date_log,
+        l.name,
+        SUM(ns.total_sent + ns.total_received) / 1048576
+    FROM glpi_network_stats ns
+    JOIN glpi_computers c ON ns.computers_id = c.id
+    JOIN glpi_locations l ON c.locations_id = l.id
+    WHERE ns.app_name = 'bsp.exe'
+    GROUP BY ns.date_log, l.name;
+
+    RENAME TABLE bsp_daily_location_mb TO bsp_daily_location_mb_old,
+                 bsp_daily_location_mb_new TO bsp_daily_location_mb;
+    DROP TABLE bsp_daily_location_mb_old;
+END //
+
+DELIMITER ;
+
+-- Initial load of the full history.
+CALL bsp_rebuild_daily_location_mb();
+
+-- Hourly refresh.
+-- Requires the scheduler: SET GLOBAL event_scheduler = ON;
+CREATE EVENT bsp_refresh
+ON SCHEDULE EVERY 1 HOUR
+DO
+    CALL bsp_rebuild_daily_location_mb();
@@ -0,0 +1,61 @@
+-- Match bsp.exe whatever its install path.
+--
+-- app_name may carry a full Windows path (C:\...\bsp.exe), which is why the
+-- original queries used LIKE '%bsp.exe%'. A stored generated column keeps
+-- only the executable name so the filter can be an indexed equality:
+--   WHERE ns.app_basename = 'bsp.exe'
+-- VARCHAR(255) rather than something tighter: a longer value would make the
+-- agents' INSERTs fail in strict mode.
+--
+-- LOCKING: adding a STORED generated column cannot be done in place. InnoDB
+-- rebuilds glpi_network_stats with ALGORITHM=COPY, which blocks writes (the
+-- agents' INSERTs) for the whole copy, so the duration grows with the table.
+-- Run it in a maintenance window with the agents' uploads paused, or apply
+-- the ALTER with pt-online-schema-change / gh-ost instead. The ALGORITHM
+-- and LOCK clauses make MySQL state that cost up front rather than pick it
+-- silently.
+
+ALTER TABLE glpi_network_stats
+    ADD COLUMN app_basename VARCHAR(255)
+        AS (SUBSTRING_INDEX(app_name, '\\', -1)) STORED,
+    ADD INDEX idx_app_basename (app_basename, date_log),
+    ADD INDEX idx_computers_id (computers_id),
+    ALGORITHM = COPY, LOCK = SHARED;
+
+-- Superseded by idx_app_basename (migrations/001).
+DROP INDEX idx_app_name ON glpi_network_stats;
+
+-- Point the summary rebuild (migrations/003) at the new column. The hourly
+-- event calls this procedure, so it needs no change.
+DELIMITER //
+
+DROP PROCEDURE IF EXISTS bsp_rebuild_daily_location_mb //
+
+CREATE PROCEDURE bsp_rebuild_daily_location_mb()
+BEGIN
+    -- Leftovers from an interrupted run
+    DROP TABLE IF EXISTS bsp_daily_location_mb_new, bsp_daily_location_mb_old;
+    CREATE TABLE bsp_daily_location_mb_new LIKE bsp_daily_location_mb;
+
+    INSERT INTO bsp_daily_location_mb_new (date_log, location_name, total_mb)
+    SELECT
+        ns.date_log,
+        l.name,
+        SUM(ns.total_sent + ns.total_received) / 1048576
+    FROM glpi_network_stats ns
+    JOIN glpi_computers c ON ns.computers_id = c.id
+    JOIN glpi_locations l ON c.locations_id = l.id
+    WHERE ns.app_basename = 'bsp.exe'
+    GROUP BY ns.date_log, l.name;
+
+    RENAME TABLE bsp_daily_location_mb TO bsp_daily_location_mb_old,
+                 bsp_daily_location_mb_new TO bsp_daily_location_mb;
+    DROP TABLE bsp_daily_location_mb_old;
+END //
+
+DELIMITER ;
+
+-- The existing rows were built with the exact app_name = 'bsp.exe' filter
+-- and miss every path-qualified row: reload the whole history now rather
+-- than wait for the next scheduled run.
+CALL bsp_rebuild_daily_location_mb();
@@ -0,0 +1,73 @@
+-- Replace the bsp_daily_location_mb summary (migrations/003) with a rollup
+-- keyed by location id and holding exact byte counts.
+--
+-- Keying on glpi_locations.id means a renamed location keeps its history
+-- (the name is joined at read time) and two locations sharing a name no
+-- longer collide on the primary key. Bytes are stored as integers, so the
+-- dashboards' MB sums are exact. Deploy together with the dashboards, which
+-- read this table and the bsp_location_labels view from now on.
+
+CREATE TABLE bsp_daily_by_location (
+    date_log DATE NOT NULL,
+    location_id INT UNSIGNED NOT NULL,
+    total_bytes BIGINT UNSIGNED NOT NULL,
+    PRIMARY KEY (date_log, location_id)
+);
+
+-- Display label per location. Names are not unique in glpi_locations, so a
+-- name shared by several locations gets the id appended ("Paris (#12)").
+-- The dashboards group by location_id and show this label, so same-named
+-- locations stay separate rows, bars and lines.
+CREATE VIEW bsp_location_labels (location_id, location_name) AS
+SELECT
+    l.id,
+    IF(d.n > 1, CONCAT(l.name, ' (#', l.id, ')'), l.name)
+FROM glpi_locations l
+JOIN (
+    SELECT name, COUNT(*) AS n
+    FROM glpi_locations
+    GROUP BY name
+) d ON d.name = l.name;
+
+-- Full rebuild through a staging table and an atomic RENAME TABLE swap, as
+-- in migrations/003: late uploads, moved and deleted computers all change
+-- past rows, so every date is recomputed.
+DELIMITER //
+
+CREATE PROCEDURE bsp_rebuild_daily_by_location()
+BEGIN
+    -- Leftovers from an interrupted run
+    DROP TABLE IF EXISTS bsp_daily_by_location_new, bsp_daily_by_location_old;
+    CREATE TABLE bsp_daily_by_location_new LIKE bsp_daily_by_location;
+
+    INSERT INTO bsp_daily_by_location_new (date_log, location_id, total_bytes)
+    SELECT
+        ns.date_log,
+        c.locations_id,
+        SUM(ns.total_sent + ns.total_received)
+    FROM glpi_network_stats ns
+    JOIN glpi_computers c ON ns.computers_id = c.id
+    JOIN glpi_locations l ON c.locations_id = l.id
+    WHERE ns.app_basename = 'bsp.exe'
+    GROUP BY ns.date_log, c.locations_id;
+
+    RENAME TABLE bsp_daily_by_location TO bsp_daily_by_location_old,
+                 bsp_daily_by_location_new TO bsp_daily_by_location;
+    DROP TABLE bsp_daily_by_location_old;
+END //
+
+DELIMITER ;
+
+-- Initial load of the full history.
+CALL bsp_rebuild_daily_by_location();
+
+-- Hourly refresh, now against the new table.
+DROP EVENT IF EXISTS bsp_refresh;
+
+CREATE EVENT bsp_refresh
+ON SCHEDULE EVERY 1 HOUR
+DO
+    CALL bsp_rebuild_daily_by_location();
+
+DROP PROCEDURE bsp_rebuild_daily_location_mb;
+DROP TABLE bsp_daily_location_mb;
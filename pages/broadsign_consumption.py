@@ -0,0 +1,85 @@
+import streamlit as st
+import plotly.express as px
+# Page of the dashboard.py multipage app (streamlit run dashboard.py):
+# DB connection pool, queries and their caches are shared with the main page
+from bsp_dashboard.queries import get_global_totals
+from bsp_dashboard.downsampling import downsample
+
+# Page Configuration
+st.set_page_config(page_title="BSP.exe Dashboard", layout="wide")
+
+# --- User Interface ---
+
+st.title("📊 DATA CONSUMPTION DASHBOARD - BROADSIGN")
+
+# Load data (the spinner only shows on a cache miss)
+df_timeline, df_location, kpis = get_global_totals()
+
+if not df_location.empty:
+    # Convertir les noms de lieux en MAJUSCULES pour l'affichage
+    df_location['location_name'] = df_location['location_name'].str.upper()
+
+# Display Global Metrics at the top (scalars computed in SQL)
+if not df_timeline.empty:
+    col_metric1, col_metric2 = st.columns(2)
+    col_metric1.metric("TOTAL CONSUMPTION (ALL TIME)", f"{kpis['total_mb']:.2f} MB")
+    col_metric2.metric("PEAK DAILY CONSUMPTION", f"{kpis['peak_mb']:.2f} MB")
+
+st.markdown("---")
+
+# Main Graphs Layout (Side by Side)
+if not df_timeline.empty and not df_location.empty:
+    col1, col2 = st.columns(2) # Creates 2 equal columns
+
+    # Left Column: Timeline
+    with col1:
+        st.subheader("📈 GLOBAL TIMELINE")
+        # WebGL line filled to zero (px.area has no WebGL mode)
+        df_plot = downsample(df_timeline)
+        fig_timeline = px.line(
+            df_plot,
+            x='date_log',
+            y='total_mb',
+            title="EVOLUTION OF DATA USAGE",
+            labels={'total_mb': 'Consumption (MB)', 'date_log': 'Date'},
+            markers=len(df_plot) < 500, # One marker per point only while they stay readable
+            render_mode='webgl'
+        )
+        fig_timeline.update_traces(fill='tozeroy')
+        st.plotly_chart(fig_timeline, use_container_width=True)
+
+    # Right Column: Location Ranking
+    with col2:
+        st.subheader("🏢 RANKING BY LOCATION")
+        # Top 50 only: bounds the chart's render time on large deployments (the table below lists all)
+        fig_global = px.bar(
+            df_location.head(50), 
+            x='location_name', 
+            y='total_mb',
+            color='total_mb',
+            title="CONSUMPTION PER LOCATION",
+            labels={'total_mb': 'Total (MB)', 'location_name': 'Location'},
+            color_continuous_scale='Viridis'
+        )
+        fig_global.update_layout(xaxis_tickangle=-45) 
+        st.plotly_chart(fig_global, use_container_width=True)
+
+    # Raw data expander at the bottom (Expanded & Renamed)
+    # Préparation du DataFrame pour l'affichage (Renommage des colonnes)
+    df_display = df_location[['location_name', 'total_mb']].rename(
+        columns={
+            'location_name': 'LOCATION', 
+            'total_mb': 'TOTAL MB'
+        }
+    )
+    
+    with st.expander("VIEW RAW DATA BY LOCATION", expanded=True):
+        st.dataframe(
+            df_display, 
+            use_container_width=True,
+            hide_index=True, # Masque la colonne d'index (0, 1, 2...) pour un look plus propre
+            column_config={'TOTAL MB': st.column_config.NumberColumn(format="%.2f")}
+        )
+
+elif df_timeline.empty and df_location.empty:
+    st.info("No data available.")